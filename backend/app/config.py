@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_NAME: str = "knowledge_base"
     COLLECTION_NAME: str = "documents"
+    STATS_COLLECTION_NAME: str = "corpus_stats"
 
     # Gemini embedding model
     EMBEDDING_MODEL: str = "models/gemini-embedding-001"
@@ -20,7 +21,22 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     TOP_K_RESULTS: int = 3
+    DOCUMENTS_PAGE_SIZE: int = 24  # Default page size for /api/documents
+    
+    # Compaction settings
+    COMPACTION_THRESHOLD: int = 10  # Tombstoned documents needed before compaction runs
+    COMPACTION_INTERVAL_SECONDS: int = 300
+    TOMBSTONE_GRACE_SECONDS: int = 60  # Age before an unreleased tombstone is reconciled by the compactor
     MIN_RELEVANCE_SCORE: float = 50.0  # Minimum relevance % to include in sources
+    CASUAL_FAST_PATH: bool = True  # Answer recognized casual messages locally without calling Gemini
+    
+    # Admin settings
+    ADMIN_TOKEN: str = ""  # Required in X-Admin-Token header for /api/admin endpoints (empty = disabled)
+    
+    # Profiling settings
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of /api requests to profile when enabled
+    PROFILE_RING_SIZE: int = 20  # Number of recent profiles kept in memory
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,14 +1,20 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import Response, JSONResponse
+from typing import Optional
+import hmac
 import os
+import time
 from app.config import settings
 from app.models import (
-    QueryRequest, QueryResponse, DocumentInfo, 
-    HealthResponse, DocumentUpload
+    QueryRequest, QueryResponse, DocumentPage, CorpusStats,
+    HealthResponse, DocumentUpload, CasualStats,
+    ProfilingStatus, ProfilingConfig, BulkDeleteRequest, CompactionResult
 )
 from app.services.document_service import document_service
 from app.services.rag_service import rag_service
+from app.services.intent_service import intent_service
+from app.services.profiling_service import profiling_service
 
 app = FastAPI(
     title="AI Knowledge Base API",
@@ -25,6 +31,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start the tombstone compactor"""
+    document_service.start_compactor()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Stop the tombstone compactor"""
+    document_service.stop_compactor()
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against the configured admin token"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    # compare_digest rejects non-ASCII str, so compare raw bytes instead;
+    # header values are decoded as latin-1, which round-trips the wire bytes
+    return hmac.compare_digest(token.encode("latin-1", "replace"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Dependency that restricts an endpoint to admin callers"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+class ProfilingMiddleware:
+    """Profile sampled requests, or a single request flagged with X-Profile: 1 by an admin.
+
+    Plain ASGI so unprofiled requests pass straight through. The profiler
+    sees the whole event-loop thread, so each profile records how many
+    requests were in flight; profiles with more than one include their work.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path.startswith("/api/admin/"):
+            await self.app(scope, receive, send)
+            return
+        
+        profiling_service.request_started()
+        try:
+            forced = False
+            if any(name == b"x-profile" for name, _ in scope["headers"]):
+                headers = dict(scope["headers"])
+                token = headers.get(b"x-admin-token", b"").decode("latin-1")
+                forced = headers[b"x-profile"] == b"1" and is_admin_token(token)
+            profiler = profiling_service.start() if profiling_service.should_profile(forced) else None
+            if profiler is None:
+                await self.app(scope, receive, send)
+                return
+            
+            profile_id = profiling_service.new_profile_id()
+            
+            async def send_with_profile_id(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode("latin-1"))]
+                await send(message)
+            
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                profiling_service.stop(profiler, profile_id, scope["method"], path, duration_ms)
+        finally:
+            profiling_service.request_finished()
+
+app.add_middleware(ProfilingMiddleware)
+
 @app.get("/", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -95,12 +173,45 @@ async def query_knowledge_base(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/documents", response_model=List[DocumentInfo])
-async def get_documents():
-    """Get all documents in the knowledge base"""
+@app.get("/api/casual/stats", response_model=CasualStats)
+async def get_casual_stats():
+    """Get hit rates for the local casual query fast path"""
+    return intent_service.get_stats()
+
+@app.get("/api/documents", response_model=DocumentPage)
+async def get_documents(
+    limit: Optional[int] = Query(default=None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: str = Query(default="upload_date", pattern="^(upload_date|filename)$"),
+    order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    search: Optional[str] = Query(default=None, max_length=200)
+):
+    """Get a page of documents in the knowledge base"""
+    try:
+        return document_service.list_documents(
+            limit=limit, cursor=cursor, sort=sort, order=order, search=search
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats", response_model=CorpusStats)
+async def get_stats():
+    """Get corpus statistics"""
+    try:
+        return document_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/documents/bulk-delete", response_model=dict)
+async def bulk_delete_documents(request: BulkDeleteRequest):
+    """Delete every document whose metadata matches all given fields"""
     try:
-        documents = document_service.get_all_documents()
-        return documents
+        deleted_count = document_service.delete_documents_by_metadata(request.metadata)
+        return {"message": "Documents deleted successfully", "deleted_count": deleted_count}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -118,6 +229,55 @@ async def delete_document(document_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/admin/profiling", response_model=ProfilingStatus, dependencies=[Depends(require_admin)])
+async def get_profiling_status():
+    """Get profiling configuration and the list of collected profiles"""
+    return profiling_service.get_status()
+
+@app.put("/api/admin/profiling", response_model=ProfilingStatus, dependencies=[Depends(require_admin)])
+async def update_profiling_config(config: ProfilingConfig):
+    """Enable/disable request sampling or change the sample rate at runtime"""
+    profiling_service.configure(enabled=config.enabled, sample_rate=config.sample_rate)
+    return profiling_service.get_status()
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str, fmt: str = Query(default="pstats", alias="format", pattern="^(pstats|speedscope)$")):
+    """Download a collected profile as a pstats or speedscope file"""
+    if fmt == "speedscope":
+        data = profiling_service.get_speedscope(profile_id)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return JSONResponse(
+            content=data,
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+        )
+    
+    data = profiling_service.get_pstats(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+    )
+
+@app.post("/api/admin/recount-stats", response_model=CorpusStats, dependencies=[Depends(require_admin)])
+async def recount_stats():
+    """Recompute corpus counters from the documents collection"""
+    try:
+        document_service.recount_counters()
+        return document_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/admin/compact", response_model=CompactionResult, dependencies=[Depends(require_admin)])
+async def compact_documents():
+    """Physically remove all tombstoned documents now"""
+    try:
+        return document_service.compact(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
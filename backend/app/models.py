@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class DocumentUpload(BaseModel):
@@ -37,9 +37,62 @@ class DocumentInfo(BaseModel):
     upload_date: str
     doc_type: str
     chunk_count: int
-    
+    file_size: Optional[int] = None
+
+class BulkDeleteRequest(BaseModel):
+    """Model for deleting every document matching metadata fields"""
+    metadata: Dict[str, Any] = Field(..., min_length=1)
+
+class DocumentPage(BaseModel):
+    """A page of documents with a cursor for the next page"""
+    documents: List[DocumentInfo]
+    next_cursor: Optional[str] = None
+
+class CorpusStats(BaseModel):
+    """Corpus statistics"""
+    total_documents: int
+    total_chunks: int
+    total_bytes: int
+    tombstoned_documents: int
+    embedding_dimensions: int
+    index_memory_bytes: int
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     message: str
     gemini_configured: bool
+
+class CasualStats(BaseModel):
+    """Casual query fast path statistics"""
+    total_casual_queries: int
+    local_hits: int
+    llm_fallbacks: int
+    hit_rate: float
+    intent_hits: Dict[str, int]
+
+class ProfileInfo(BaseModel):
+    """Summary of a collected request profile"""
+    id: str
+    method: str
+    path: str
+    timestamp: str
+    duration_ms: float
+    in_flight_requests: int  # Peak concurrent requests while profiling; >1 means shared CPU time is included
+
+class ProfilingStatus(BaseModel):
+    """Profiling configuration and collected profiles"""
+    enabled: bool
+    sample_rate: float
+    ring_size: int
+    profiles: List[ProfileInfo]
+
+class ProfilingConfig(BaseModel):
+    """Model for runtime profiling configuration updates"""
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+class CompactionResult(BaseModel):
+    """Result of a compaction run"""
+    removed: int
+    tombstones: int
@@ -1,7 +1,10 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING
 from typing import List, Dict, Any
 import uuid
-from datetime import datetime
+import json
+import re
+import threading
+from datetime import datetime, timedelta
 import PyPDF2
 import io
 import base64
@@ -9,6 +12,11 @@ import numpy as np
 from app.config import settings
 from app.services.embedding_service import embedding_service
 
+STATS_ID = "corpus"
+# API sort name -> stored field; filenames sort case-insensitively
+SORT_FIELDS = {"upload_date": "upload_date", "filename": "filename_lower"}
+LIVE_FILTER = {"deleted": {"$ne": True}}
+
 class DocumentService:
     """Service for managing documents and vector store with MongoDB"""
     
@@ -22,13 +30,91 @@ class DocumentService:
         )
         self.db = self.client[settings.DATABASE_NAME]
         self.collection = self.db[settings.COLLECTION_NAME]
+        self.stats_collection = self.db[settings.STATS_COLLECTION_NAME]
+        self._compactor_stop = threading.Event()
+        self._compactor_thread = None
         # Test connection
         try:
             self.client.admin.command('ping')
             print(f"✅ Connected to MongoDB: {settings.DATABASE_NAME}")
+            self._ensure_indexes()
+            self._ensure_counters()
         except Exception as e:
             print(f"⚠️ MongoDB connection warning: {e}")
     
+    def _ensure_indexes(self):
+        """Create indexes backing paginated document listing"""
+        # Compound with _id so keyset pagination has a unique tiebreaker;
+        # Mongo walks the same index in either direction for asc/desc sorts
+        # (filename_lower, _id) also serves the anchored prefix filename search
+        for field in SORT_FIELDS.values():
+            self.collection.create_index([(field, ASCENDING), ("_id", ASCENDING)])
+        for stale_index in ("filename_1__id_1", "filename_lower_1"):
+            if stale_index in self.collection.index_information():
+                self.collection.drop_index(stale_index)
+        # Keyset cursors need every sort field present as a string
+        self.collection.update_many(
+            {"filename_lower": {"$exists": False}},
+            [{"$set": {"filename_lower": {"$toLower": "$filename"}}}]
+        )
+        self.collection.update_many(
+            {"upload_date": {"$not": {"$type": "string"}}},
+            {"$set": {"upload_date": ""}}
+        )
+        # Tombstone lookups: the compactor counts/removes by "deleted", and the
+        # per-batch counter rollback is covered by the delete_batch index
+        self.collection.create_index([("deleted", ASCENDING)])
+        self.collection.create_index([("delete_batch", ASCENDING), ("total_chunks", ASCENDING), ("file_size", ASCENDING)])
+    
+    def _compute_counters(self) -> Dict[str, int]:
+        """Compute corpus counters with a full aggregation over live documents"""
+        # Older documents have no file_size; derive it from the base64 length
+        self.collection.update_many(
+            {"file_size": {"$exists": False}},
+            [{"$set": {"file_size": {"$toLong": {"$floor": {"$multiply": [
+                {"$strLenBytes": {"$ifNull": ["$pdf_binary", ""]}}, 0.75
+            ]}}}}}]
+        )
+        # Tombstones still count until _release_batch rolls them back
+        totals = list(self.collection.aggregate([
+            {"$match": {"$nor": [{"deleted": True, "counters_released": True}]}},
+            {"$group": {
+                "_id": None,
+                "total_documents": {"$sum": 1},
+                "total_chunks": {"$sum": {"$ifNull": ["$total_chunks", 0]}},
+                "total_bytes": {"$sum": "$file_size"}
+            }}
+        ]))
+        counters = totals[0] if totals else {}
+        return {
+            "total_documents": counters.get("total_documents", 0),
+            "total_chunks": counters.get("total_chunks", 0),
+            "total_bytes": int(counters.get("total_bytes", 0))
+        }
+    
+    def _ensure_counters(self):
+        """Backfill corpus counters once from existing documents if missing"""
+        if self.stats_collection.find_one({"_id": STATS_ID}, {"_id": 1}):
+            return
+        counters = self._compute_counters()
+        self.stats_collection.update_one({"_id": STATS_ID}, {"$setOnInsert": counters}, upsert=True)
+        print(f"✅ Initialized corpus counters: {counters['total_documents']} documents")
+    
+    def recount_counters(self) -> Dict[str, int]:
+        """Recompute corpus counters from scratch, repairing any drift"""
+        counters = self._compute_counters()
+        self.stats_collection.update_one({"_id": STATS_ID}, {"$set": counters}, upsert=True)
+        print(f"✅ Recounted corpus counters: {counters['total_documents']} documents")
+        return counters
+    
+    def _update_counters(self, documents: int = 0, chunks: int = 0, size: int = 0):
+        """Incrementally update corpus counters"""
+        self.stats_collection.update_one(
+            {"_id": STATS_ID},
+            {"$inc": {"total_documents": documents, "total_chunks": chunks, "total_bytes": size}},
+            upsert=True
+        )
+    
     def chunk_text_with_lines(self, text: str, chunk_size: int = None, overlap: int = None) -> List[Dict[str, Any]]:
         """Split text into overlapping chunks with line number tracking"""
         chunk_size = chunk_size or settings.CHUNK_SIZE
@@ -149,8 +235,10 @@ class DocumentService:
         document = {
             "_id": doc_id,
             "filename": filename,
+            "filename_lower": filename.lower(),
             "doc_type": "pdf",
             "pdf_binary": base64.b64encode(pdf_content).decode('utf-8'),
+            "file_size": len(pdf_content),
             "chunks": chunks_with_embeddings,
             "total_chunks": len(chunks_with_embeddings),
             "upload_date": datetime.utcnow().isoformat(),
@@ -158,6 +246,7 @@ class DocumentService:
         }
         
         self.collection.insert_one(document)
+        self._update_counters(documents=1, chunks=len(chunks_with_embeddings), size=len(pdf_content))
         print(f"✅ Stored document {filename} with {len(chunks_with_embeddings)} chunks")
         
         return doc_id
@@ -170,7 +259,7 @@ class DocumentService:
         query_embedding = embedding_service.generate_query_embedding(query)
         
         # Get all documents with chunks
-        all_docs = list(self.collection.find({}, {"filename": 1, "chunks": 1, "doc_type": 1}))
+        all_docs = list(self.collection.find(LIVE_FILTER, {"filename": 1, "chunks": 1, "doc_type": 1}))
         
         if not all_docs:
             return []
@@ -212,31 +301,213 @@ class DocumentService:
         v2 = np.array(vec2)
         return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
     
-    def get_all_documents(self) -> List[Dict[str, Any]]:
-        """Get all unique documents in the knowledge base"""
-        documents = list(self.collection.find(
-            {},
-            {"_id": 1, "filename": 1, "upload_date": 1, "doc_type": 1, "total_chunks": 1}
-        ))
+    def _encode_cursor(self, value: Any, doc_id: str) -> str:
+        """Encode the last row's sort key as an opaque cursor"""
+        return base64.urlsafe_b64encode(json.dumps([value, doc_id]).encode('utf-8')).decode('utf-8')
+    
+    def _decode_cursor(self, cursor: str) -> List[Any]:
+        """Decode a cursor into [sort value, document id]"""
+        try:
+            value, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        # Sort fields and _id are strings; anything else could be read as a query operator
+        if not isinstance(value, str) or not isinstance(doc_id, str):
+            raise ValueError("Invalid cursor")
+        return [value, doc_id]
+    
+    def list_documents(self, limit: int = None, cursor: str = None, sort: str = "upload_date",
+                       order: str = "desc", search: str = None) -> Dict[str, Any]:
+        """Get a page of documents using keyset (cursor) pagination"""
+        limit = limit or settings.DOCUMENTS_PAGE_SIZE
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort}")
+        field = SORT_FIELDS[sort]
+        direction = -1 if order == "desc" else 1
+        
+        match: Dict[str, Any] = dict(LIVE_FILTER)
+        if search:
+            match["filename_lower"] = {"$regex": "^" + re.escape(search.lower())}
+        if cursor:
+            value, doc_id = self._decode_cursor(cursor)
+            op = "$lt" if direction == -1 else "$gt"
+            match["$or"] = [
+                {field: {op: value}},
+                {field: value, "_id": {op: doc_id}}
+            ]
+        
+        # Fetch one extra row to know whether another page exists
+        documents = list(self.collection.aggregate([
+            {"$match": match},
+            {"$sort": {field: direction, "_id": direction}},
+            {"$limit": limit + 1},
+            {"$project": {"_id": 1, "filename": 1, "filename_lower": 1, "upload_date": 1, "doc_type": 1, "total_chunks": 1, "file_size": 1}}
+        ]))
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            value = last.get(field)
+            # Sort fields are backfilled at startup; a missing one would silently end pagination
+            if not isinstance(value, str):
+                raise Exception(f"Document {last['_id']} has no {field}; restart to backfill it")
+            next_cursor = self._encode_cursor(value, str(last["_id"]))
+        
+        return {
+            "documents": [
+                {
+                    "id": str(doc["_id"]),
+                    "filename": doc.get("filename", "Unknown"),
+                    "upload_date": doc.get("upload_date", ""),
+                    "doc_type": doc.get("doc_type", "pdf"),
+                    "chunk_count": doc.get("total_chunks", 0),
+                    "file_size": doc.get("file_size")
+                }
+                for doc in documents
+            ],
+            "next_cursor": next_cursor
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus statistics from incrementally maintained counters"""
+        counters = self.stats_collection.find_one({"_id": STATS_ID}) or {}
+        total_chunks = counters.get("total_chunks", 0)
+        dimensions = embedding_service.dimension
+        return {
+            "total_documents": counters.get("total_documents", 0),
+            "total_chunks": total_chunks,
+            "total_bytes": counters.get("total_bytes", 0),
+            "tombstoned_documents": self.collection.count_documents({"deleted": True}),
+            "embedding_dimensions": dimensions,
+            # Embeddings are scored as float64 numpy vectors during search
+            "index_memory_bytes": total_chunks * dimensions * 8
+        }
+    
+    def _tombstone(self, query: Dict[str, Any]) -> int:
+        """Mark matching documents as deleted and roll back their counters.
+
+        Only a few small fields are written, so the cost does not depend on
+        document size; chunks and PDF blobs are removed later by compact().
+        """
+        batch_id = str(uuid.uuid4())
+        result = self.collection.update_many(
+            {**query, **LIVE_FILTER},
+            {"$set": {
+                "deleted": True,
+                "deleted_at": datetime.utcnow().isoformat(),
+                "delete_batch": batch_id
+            }}
+        )
+        if result.modified_count == 0:
+            return 0
         
-        return [
+        # The documents are deleted either way; a failed release is retried
+        # by the compactor's reconcile step
+        try:
+            self._release_batch(batch_id)
+        except Exception as e:
+            print(f"⚠️ Deferred counter rollback for delete batch {batch_id}: {e}")
+        return result.modified_count
+    
+    def _release_batch(self, batch_id: str):
+        """Roll back counters for a delete batch and mark it compactable (idempotent)"""
+        # Covered by the delete_batch index, so no document bodies are read
+        totals = list(self.collection.aggregate([
+            {"$match": {"delete_batch": batch_id}},
+            {"$project": {"_id": 0, "total_chunks": 1, "file_size": 1}},
+            {"$group": {
+                "_id": None,
+                "documents": {"$sum": 1},
+                "chunks": {"$sum": "$total_chunks"},
+                "size": {"$sum": "$file_size"}
+            }}
+        ]))
+        counters = totals[0] if totals else {}
+        # Recording the batch id in the same write makes a retried rollback a no-op
+        self.stats_collection.update_one(
+            {"_id": STATS_ID, "released_batches": {"$ne": batch_id}},
             {
-                "id": str(doc["_id"]),
-                "filename": doc.get("filename", "Unknown"),
-                "upload_date": doc.get("upload_date", ""),
-                "doc_type": doc.get("doc_type", "pdf"),
-                "chunk_count": doc.get("total_chunks", 0)
+                "$inc": {
+                    "total_documents": -counters.get("documents", 0),
+                    "total_chunks": -counters.get("chunks", 0),
+                    "total_bytes": -counters.get("size", 0)
+                },
+                "$addToSet": {"released_batches": batch_id}
             }
-            for doc in documents
-        ]
+        )
+        self.collection.update_many({"delete_batch": batch_id}, {"$set": {"counters_released": True}})
+        self.stats_collection.update_one({"_id": STATS_ID}, {"$pull": {"released_batches": batch_id}})
+    
+    def _reconcile_tombstones(self) -> int:
+        """Finish counter rollbacks that were interrupted; returns batches released"""
+        cutoff = (datetime.utcnow() - timedelta(seconds=settings.TOMBSTONE_GRACE_SECONDS)).isoformat()
+        batches = self.collection.distinct("delete_batch", {
+            "deleted": True,
+            "counters_released": {"$ne": True},
+            "deleted_at": {"$lt": cutoff}
+        })
+        for batch_id in batches:
+            self._release_batch(batch_id)
+        
+        # Drop batch ids left behind by a crash between release and $pull
+        stats = self.stats_collection.find_one({"_id": STATS_ID}, {"released_batches": 1}) or {}
+        for batch_id in stats.get("released_batches", []):
+            if not self.collection.find_one({"delete_batch": batch_id, "counters_released": {"$ne": True}}, {"_id": 1}):
+                self.stats_collection.update_one({"_id": STATS_ID}, {"$pull": {"released_batches": batch_id}})
+        return len(batches)
     
     def delete_document(self, doc_id: str) -> bool:
-        """Delete a document and all its chunks"""
-        try:
-            result = self.collection.delete_one({"_id": doc_id})
-            return result.deleted_count > 0
-        except Exception as e:
-            print(f"Error deleting document: {e}")
-            return False
+        """Delete a document (tombstoned; physically removed by the compactor)"""
+        return self._tombstone({"_id": doc_id}) > 0
+    
+    def delete_documents_by_metadata(self, metadata: Dict[str, Any]) -> int:
+        """Delete every document whose metadata matches all given key/value pairs"""
+        if not metadata:
+            raise ValueError("At least one metadata field is required")
+        query = {}
+        for key, value in metadata.items():
+            if not key or key.startswith("$") or "." in key:
+                raise ValueError(f"Invalid metadata field: {key}")
+            # {field: None} would also match documents without the field
+            if value is None or isinstance(value, dict):
+                raise ValueError(f"Invalid value for metadata field: {key}")
+            query[f"metadata.{key}"] = value
+        return self._tombstone(query)
+    
+    def compact(self, force: bool = False) -> Dict[str, Any]:
+        """Physically remove tombstoned documents once past the threshold"""
+        reconciled = self._reconcile_tombstones()
+        if reconciled:
+            print(f"🧹 Reconciled counters for {reconciled} interrupted delete batches")
+        
+        releasable = {"deleted": True, "counters_released": True}
+        tombstones = self.collection.count_documents(releasable)
+        if tombstones == 0 or (not force and tombstones < settings.COMPACTION_THRESHOLD):
+            return {"removed": 0, "tombstones": self.collection.count_documents({"deleted": True})}
+        
+        result = self.collection.delete_many(releasable)
+        print(f"🧹 Compacted {result.deleted_count} deleted documents")
+        # Recount: documents may have been tombstoned since the first count
+        return {"removed": result.deleted_count, "tombstones": self.collection.count_documents({"deleted": True})}
+    
+    def _run_compactor(self):
+        while not self._compactor_stop.wait(settings.COMPACTION_INTERVAL_SECONDS):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"⚠️ Compaction error: {e}")
+    
+    def start_compactor(self):
+        """Start the background compaction thread"""
+        if self._compactor_thread and self._compactor_thread.is_alive():
+            return
+        self._compactor_stop.clear()
+        self._compactor_thread = threading.Thread(target=self._run_compactor, name="compactor", daemon=True)
+        self._compactor_thread.start()
+    
+    def stop_compactor(self):
+        """Stop the background compaction thread"""
+        self._compactor_stop.set()
 
 document_service = DocumentService()
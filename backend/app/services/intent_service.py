@@ -0,0 +1,108 @@
+import random
+import re
+import threading
+from typing import Dict, List, Optional
+
+class IntentService:
+    """Local intent classifier and templated responses for casual messages"""
+
+    # Intent -> keyword patterns (matched against the normalized message)
+    INTENT_PATTERNS: Dict[str, List[str]] = {
+        "greeting": [
+            r"hi+", r"hey+", r"hello+", r"hiya", r"yo", r"howdy", r"greetings",
+            r"good (morning|afternoon|evening|day)", r"(hi|hey|hello) there",
+        ],
+        "thanks": [
+            r"thanks?( you)?( so much| a lot)?", r"thx", r"ty", r"cheers",
+            r"much appreciated", r"(great|perfect|awesome|nice),? thanks?( you)?",
+        ],
+        "farewell": [
+            r"bye+", r"goodbye", r"see (you|ya)( later)?", r"good ?night",
+            r"cya", r"later", r"take care",
+        ],
+        "acknowledgement": [
+            r"ok(ay)?", r"k", r"cool", r"got it", r"great", r"nice", r"perfect",
+            r"awesome", r"sounds good", r"alright", r"sure", r"yes", r"yep",
+        ],
+        "help": [
+            r"help", r"help me", r"start", r"menu", r"options",
+        ],
+    }
+
+    # Intent -> response pool
+    RESPONSES: Dict[str, List[str]] = {
+        "greeting": [
+            "👋 Hello! Ask me anything about your uploaded documents.",
+            "Hi there! What would you like to know from the knowledge base?",
+            "Hey! I'm ready to help — ask a question about your documents.",
+        ],
+        "thanks": [
+            "You're welcome! Let me know if you have any other questions.",
+            "Happy to help! Feel free to ask anything else about your documents.",
+            "Anytime! 😊",
+        ],
+        "farewell": [
+            "Goodbye! Come back anytime you need to search your documents.",
+            "See you later! 👋",
+            "Take care! Your knowledge base will be here when you need it.",
+        ],
+        "acknowledgement": [
+            "Great! Let me know if there's anything else you'd like to know.",
+            "👍 Feel free to ask another question about your documents.",
+        ],
+        "help": [
+            "I can answer questions using the documents in your knowledge base. "
+            "Upload PDFs in the Document Manager, then ask things like "
+            "*\"What is the refund policy?\"* or *\"How do I reset my password?\"*",
+        ],
+    }
+
+    def __init__(self):
+        self._compiled = {
+            intent: re.compile(r"^(?:" + "|".join(patterns) + r")$")
+            for intent, patterns in self.INTENT_PATTERNS.items()
+        }
+        self._lock = threading.Lock()
+        self._intent_hits: Dict[str, int] = {intent: 0 for intent in self.INTENT_PATTERNS}
+        self._local_hits = 0
+        self._llm_fallbacks = 0
+
+    def _normalize(self, message: str) -> str:
+        """Lowercase, strip punctuation/emoji and collapse whitespace"""
+        text = re.sub(r"[^\w\s']", " ", message.lower())
+        return " ".join(text.split())
+
+    def classify(self, message: str) -> Optional[str]:
+        """Return the matched intent for a casual message, or None if unrecognized"""
+        text = self._normalize(message)
+        if not text:
+            return None
+        for intent, pattern in self._compiled.items():
+            if pattern.match(text):
+                return intent
+        return None
+
+    def get_response(self, message: str) -> Optional[str]:
+        """Return a templated response, or None if the LLM should handle it"""
+        intent = self.classify(message)
+        with self._lock:
+            if intent is None:
+                self._llm_fallbacks += 1
+                return None
+            self._local_hits += 1
+            self._intent_hits[intent] += 1
+        return random.choice(self.RESPONSES[intent])
+
+    def get_stats(self) -> Dict[str, object]:
+        """Return fast path hit counters"""
+        with self._lock:
+            total = self._local_hits + self._llm_fallbacks
+            return {
+                "total_casual_queries": total,
+                "local_hits": self._local_hits,
+                "llm_fallbacks": self._llm_fallbacks,
+                "hit_rate": round(self._local_hits / total, 4) if total else 0.0,
+                "intent_hits": dict(self._intent_hits),
+            }
+
+intent_service = IntentService()
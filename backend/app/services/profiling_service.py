@@ -0,0 +1,194 @@
+import cProfile
+import marshal
+import random
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.config import settings
+
+class ProfilingService:
+    """On-demand request profiling with a bounded in-memory ring of results"""
+
+    def __init__(self):
+        self.enabled = settings.PROFILING_ENABLED
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self._profiles = deque(maxlen=settings.PROFILE_RING_SIZE)
+        self._ring_lock = threading.Lock()
+        # Only one profiler can be active per interpreter at a time
+        self._active_lock = threading.Lock()
+        # Requests in flight, and the peak seen while a profile is running
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def request_started(self):
+        """Track a request entering the app"""
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def request_finished(self):
+        """Track a request leaving the app"""
+        self._in_flight -= 1
+
+    def new_profile_id(self) -> str:
+        """Generate an id for a profile before it is stored"""
+        return uuid.uuid4().hex[:12]
+
+    def should_profile(self, forced: bool = False) -> bool:
+        """Decide whether the current request should be profiled"""
+        if forced:
+            return True
+        return self.enabled and self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start a profiler, or return None if another request is already being profiled"""
+        if not self._active_lock.acquire(blocking=False):
+            return None
+        self._peak_in_flight = self._in_flight
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except Exception:
+            self._active_lock.release()
+            raise
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile, profile_id: str, method: str, path: str, duration_ms: float):
+        """Stop a profiler and store its stats in the ring"""
+        try:
+            profiler.disable()
+            in_flight = self._peak_in_flight
+        finally:
+            self._active_lock.release()
+        profiler.create_stats()
+
+        with self._ring_lock:
+            self._profiles.append({
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "timestamp": datetime.utcnow().isoformat(),
+                "duration_ms": round(duration_ms, 2),
+                # Other requests on the event loop are captured too when > 1
+                "in_flight_requests": in_flight,
+                "stats": profiler.stats
+            })
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None):
+        """Update sampling settings at runtime"""
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """List collected profiles, newest first"""
+        with self._ring_lock:
+            profiles = list(self._profiles)
+        return [
+            {key: value for key, value in profile.items() if key != "stats"}
+            for profile in reversed(profiles)
+        ]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current profiling configuration and collected profiles"""
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "ring_size": self._profiles.maxlen,
+            "profiles": self.list_profiles()
+        }
+
+    def _get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._ring_lock:
+            for profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+    def get_pstats(self, profile_id: str) -> Optional[bytes]:
+        """Get a profile as a pstats file (loadable with pstats.Stats)"""
+        profile = self._get_profile(profile_id)
+        if profile is None:
+            return None
+        return marshal.dumps(profile["stats"])
+
+    def get_speedscope(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Get a profile in speedscope's JSON file format"""
+        profile = self._get_profile(profile_id)
+        if profile is None:
+            return None
+        name = f"{profile['method']} {profile['path']} ({profile['id']})"
+        return self._to_speedscope(profile["stats"], name)
+
+    def _to_speedscope(self, stats: Dict[tuple, tuple], name: str) -> Dict[str, Any]:
+        """Convert cProfile stats to a sampled speedscope profile.
+
+        cProfile only records caller/callee edges, so stacks are rebuilt by
+        walking the call graph from its roots and splitting each function's
+        time across callers in proportion to the time spent under each one.
+        """
+        frames = []
+        frame_index = {}
+        for func in stats:
+            filename, line, func_name = func
+            frame_index[func] = len(frames)
+            frames.append({"name": func_name, "file": filename, "line": line})
+
+        callees = {func: [] for func in stats}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller in callers:
+                if caller in callees:
+                    callees[caller].append(func)
+        roots = [
+            func for func, (_, _, _, _, callers) in stats.items()
+            if not any(caller in stats for caller in callers)
+        ]
+
+        samples = []
+        weights = []
+        max_samples = 50000
+        max_depth = 256
+
+        def walk(func, stack, fraction):
+            if len(samples) >= max_samples or len(stack) > max_depth:
+                return
+            self_time = stats[func][2] * fraction
+            if self_time > 0:
+                samples.append([frame_index[f] for f in stack])
+                weights.append(self_time)
+            for child in callees[func]:
+                if child in stack:
+                    continue
+                child_total = stats[child][3]
+                edge_total = stats[child][4][func][3]
+                if child_total <= 0 or edge_total <= 0:
+                    continue
+                child_fraction = fraction * edge_total / child_total
+                if child_fraction < 1e-6:
+                    continue
+                stack.append(child)
+                walk(child, stack, child_fraction)
+                stack.pop()
+
+        for root in roots:
+            walk(root, [root], 1.0)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }],
+            "name": name,
+            "exporter": "knowledge-base-api"
+        }
+
+profiling_service = ProfilingService()
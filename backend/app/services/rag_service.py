@@ -2,6 +2,7 @@ import google.generativeai as genai
 from typing import List, Dict, Any
 from app.config import settings
 from app.services.document_service import document_service
+from app.services.intent_service import intent_service
 from app.models import QueryResponse, Source
 
 class RAGService:
@@ -22,6 +23,12 @@ class RAGService:
     
     def generate_casual_response(self, query: str) -> QueryResponse:
         """Generate a casual conversational response without RAG"""
+        # Answer recognized intents locally; only unrecognized input goes to the LLM
+        if settings.CASUAL_FAST_PATH:
+            answer = intent_service.get_response(query)
+            if answer is not None:
+                return QueryResponse(answer=answer, sources=[], query=query)
+        
         try:
             prompt = f"""You are a friendly AI assistant for a knowledge base system. 
 The user sent a casual message. Respond naturally and briefly.
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import axios from 'axios';
 import { 
@@ -8,30 +8,99 @@ import {
   TrashIcon, 
   CloudArrowUpIcon,
   CheckCircleIcon,
-  XCircleIcon 
+  XCircleIcon,
+  MagnifyingGlassIcon
 } from '@heroicons/react/24/outline';
 import { format } from 'date-fns';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+const PAGE_SIZE = 24;
+
+const SORT_OPTIONS = [
+  { value: 'upload_date:desc', label: 'Newest first' },
+  { value: 'upload_date:asc', label: 'Oldest first' },
+  { value: 'filename:asc', label: 'Name (A-Z)' },
+  { value: 'filename:desc', label: 'Name (Z-A)' },
+];
+
+const formatBytes = (bytes) => {
+  if (!bytes) return '0 B';
+  const units = ['B', 'KB', 'MB', 'GB'];
+  const i = Math.min(Math.floor(Math.log(bytes) / Math.log(1024)), units.length - 1);
+  return `${(bytes / Math.pow(1024, i)).toFixed(i === 0 ? 0 : 1)} ${units[i]}`;
+};
 
 export default function DocumentManager() {
   const [documents, setDocuments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [stats, setStats] = useState(null);
+  const [search, setSearch] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  const [sortOption, setSortOption] = useState(SORT_OPTIONS[0].value);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [uploadingFile, setUploadingFile] = useState(false);
   const [notification, setNotification] = useState(null);
+  // Id of the latest documents request; older responses are ignored
+  const requestIdRef = useRef(0);
 
   useEffect(() => {
-    loadDocuments();
+    loadStats();
   }, []);
 
-  const loadDocuments = async () => {
+  // The current cursor belongs to the previous query as soon as it changes
+  useEffect(() => {
+    setNextCursor(null);
+  }, [search, sortOption]);
+
+  // Debounce typing only; the first load and sort changes are immediate
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(search), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  useEffect(() => {
+    loadDocuments();
+  }, [debouncedSearch, sortOption]);
+
+  const loadDocuments = async (cursor = null) => {
+    const requestId = ++requestIdRef.current;
+    const [sort, order] = sortOption.split(':');
     try {
-      const response = await axios.get(`${API_URL}/api/documents`);
-      setDocuments(response.data);
+      const response = await axios.get(`${API_URL}/api/documents`, {
+        params: {
+          limit: PAGE_SIZE,
+          sort,
+          order,
+          search: debouncedSearch.trim() || undefined,
+          cursor: cursor || undefined,
+        }
+      });
+      if (requestId !== requestIdRef.current) return;
+      const { documents: page, next_cursor } = response.data;
+      setDocuments((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(next_cursor);
     } catch (error) {
+      if (requestId !== requestIdRef.current) return;
       showNotification('Failed to load documents', 'error');
     } finally {
-      setIsLoading(false);
+      if (requestId === requestIdRef.current) setIsLoading(false);
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    await loadDocuments(nextCursor);
+    setIsLoadingMore(false);
+  };
+
+  const loadStats = async () => {
+    try {
+      const response = await axios.get(`${API_URL}/api/stats`);
+      setStats(response.data);
+    } catch (error) {
+      setStats(null);
     }
   };
 
@@ -65,6 +134,7 @@ export default function DocumentManager() {
 
       showNotification(`${file.name} uploaded successfully!`, 'success');
       loadDocuments();
+      loadStats();
     } catch (error) {
       showNotification(
         error.response?.data?.detail || 'Failed to upload document',
@@ -82,7 +152,8 @@ export default function DocumentManager() {
     try {
       await axios.delete(`${API_URL}/api/documents/${docId}`);
       showNotification('Document deleted successfully', 'success');
-      loadDocuments();
+      setDocuments((prev) => prev.filter((doc) => doc.id !== docId));
+      loadStats();
     } catch (error) {
       showNotification('Failed to delete document', 'error');
     }
@@ -117,6 +188,11 @@ export default function DocumentManager() {
               <p className="text-gray-500 dark:text-gray-400 mt-1">
                 Upload and manage your knowledge base documents
               </p>
+              {stats && (
+                <p className="text-xs text-gray-400 dark:text-gray-500 mt-1">
+                  {stats.total_documents} documents · {stats.total_chunks} chunks · {formatBytes(stats.total_bytes)}
+                </p>
+              )}
             </div>
 
             {/* Upload Button */}
@@ -136,6 +212,29 @@ export default function DocumentManager() {
               </div>
             </label>
           </div>
+
+          {/* Search and Sort */}
+          <div className="flex items-center gap-3 mt-4">
+            <div className="relative flex-1">
+              <MagnifyingGlassIcon className="w-5 h-5 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2" />
+              <input
+                type="text"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+                placeholder="Search by filename..."
+                className="w-full pl-10 pr-4 py-2 bg-gray-50 dark:bg-gray-900 border border-gray-200 dark:border-gray-700 rounded-xl text-sm text-gray-900 dark:text-white focus:outline-none focus:ring-2 focus:ring-blue-500"
+              />
+            </div>
+            <select
+              value={sortOption}
+              onChange={(e) => setSortOption(e.target.value)}
+              className="px-4 py-2 bg-gray-50 dark:bg-gray-900 border border-gray-200 dark:border-gray-700 rounded-xl text-sm text-gray-700 dark:text-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
+            >
+              {SORT_OPTIONS.map((option) => (
+                <option key={option.value} value={option.value}>{option.label}</option>
+              ))}
+            </select>
+          </div>
         </div>
       </div>
 
@@ -174,6 +273,10 @@ export default function DocumentManager() {
                 <p className="text-gray-500 dark:text-gray-400">Loading documents...</p>
               </div>
             </div>
+          ) : documents.length === 0 && debouncedSearch.trim() ? (
+            <div className="flex items-center justify-center h-64">
+              <p className="text-gray-500 dark:text-gray-400">No documents match "{debouncedSearch.trim()}"</p>
+            </div>
           ) : documents.length === 0 ? (
             <motion.div
               initial={{ opacity: 0, scale: 0.9 }}
@@ -214,7 +317,7 @@ export default function DocumentManager() {
                     initial={{ opacity: 0, y: 20 }}
                     animate={{ opacity: 1, y: 0 }}
                     exit={{ opacity: 0, scale: 0.9 }}
-                    transition={{ delay: idx * 0.05 }}
+                    transition={{ delay: (idx % PAGE_SIZE) * 0.05 }}
                     className="bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-xl p-5 hover:shadow-lg transition-shadow"
                   >
                     <div className="flex items-start justify-between mb-3">
@@ -258,6 +361,21 @@ export default function DocumentManager() {
             </div>
           )}
 
+          {/* Pagination */}
+          {nextCursor && !isLoading && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={loadMore}
+                disabled={isLoadingMore}
+                className={`px-6 py-2 bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-xl text-sm font-medium text-gray-700 dark:text-gray-300 hover:shadow-md transition-shadow ${
+                  isLoadingMore ? 'opacity-50 cursor-not-allowed' : ''
+                }`}
+              >
+                {isLoadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
+
           {/* Upload Instructions */}
           {documents.length > 0 && (
             <motion.div